@@ -0,0 +1,180 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+from fastapi import HTTPException, status
+from app.rag.hedging import LatencyTracker
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger()
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+LANES = (INTERACTIVE, BATCH)
+
+# Beyond this many users, the least recently seen user's bucket is evicted
+MAX_TRACKED_USERS = 10000
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self) -> float:
+        """Take a token; return 0 on success or the seconds until one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        """Return a token taken for a request that was not served."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+def too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+class AdmissionController:
+    """Bounds concurrent chat work.
+
+    Requests first pass a per-user token bucket, then take one of
+    ADMISSION_MAX_IN_FLIGHT slots. When all slots are busy they wait in a
+    short, bounded queue per lane; freed slots go to interactive waiters
+    before batch ones, and batch work never holds more than
+    ADMISSION_BATCH_MAX_IN_FLIGHT slots. Anything that cannot be admitted
+    promptly gets a 429 with Retry-After instead of queueing indefinitely.
+    """
+
+    def __init__(self):
+        self.max_in_flight = settings.ADMISSION_MAX_IN_FLIGHT
+        self.lane_limits = {
+            INTERACTIVE: settings.ADMISSION_MAX_IN_FLIGHT,
+            BATCH: settings.ADMISSION_BATCH_MAX_IN_FLIGHT,
+        }
+        self.queue_limits = {
+            INTERACTIVE: settings.ADMISSION_INTERACTIVE_QUEUE_SIZE,
+            BATCH: settings.ADMISSION_BATCH_QUEUE_SIZE,
+        }
+        self.in_flight: Dict[str, int] = {lane: 0 for lane in LANES}
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.admitted: Dict[str, int] = {lane: 0 for lane in LANES}
+        self.rejected: Dict[str, int] = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self.queue_wait = LatencyTracker("admission_queue", min_samples=1)
+
+    @property
+    def total_in_flight(self) -> int:
+        return sum(self.in_flight.values())
+
+    def _has_capacity(self, lane: str) -> bool:
+        return self.total_in_flight < self.max_in_flight and self.in_flight[lane] < self.lane_limits[lane]
+
+    def _check_rate_limit(self, user_id: str) -> TokenBucket:
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(settings.RATE_LIMIT_PER_MINUTE / 60.0, settings.RATE_LIMIT_BURST)
+            self.buckets[user_id] = bucket
+            while len(self.buckets) > MAX_TRACKED_USERS:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(user_id)
+        retry_after = bucket.try_acquire()
+        if retry_after > 0:
+            self.rejected["rate_limited"] += 1
+            raise too_many_requests("Rate limit exceeded", retry_after)
+        return bucket
+
+    async def _acquire(self, lane: str):
+        # Skip the queue only if nobody with equal or higher priority is waiting
+        queued_ahead = len(self.waiters[INTERACTIVE]) + (len(self.waiters[BATCH]) if lane == BATCH else 0)
+        if not queued_ahead and self._has_capacity(lane):
+            self.in_flight[lane] += 1
+            return
+
+        if len(self.waiters[lane]) >= self.queue_limits[lane]:
+            self.rejected["queue_full"] += 1
+            raise too_many_requests("Server is busy", settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters[lane].append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, timeout=settings.ADMISSION_MAX_QUEUE_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over as the timeout fired; keep it
+            if waiter.done() and not waiter.cancelled():
+                return
+            self.rejected["queue_timeout"] += 1
+            raise too_many_requests("Server is busy", settings.ADMISSION_RETRY_AFTER_SECONDS)
+        except asyncio.CancelledError:
+            # A slot may have been handed over just before the client went away
+            if waiter.done() and not waiter.cancelled():
+                self._release(lane)
+            raise
+        finally:
+            if waiter in self.waiters[lane]:
+                self.waiters[lane].remove(waiter)
+            self.queue_wait.record(time.perf_counter() - start)
+
+    def _release(self, lane: str):
+        self.in_flight[lane] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Hand free slots to waiters, interactive lane first."""
+        for lane in LANES:
+            waiters = self.waiters[lane]
+            while waiters and self._has_capacity(lane):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self.in_flight[lane] += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def admit(self, user_id: str, lane: str = INTERACTIVE):
+        """Hold an admission slot for the duration of the block, or raise 429."""
+        if lane not in LANES:
+            lane = INTERACTIVE
+        bucket = self._check_rate_limit(user_id)
+        try:
+            await self._acquire(lane)
+        except (HTTPException, asyncio.CancelledError):
+            # Overload is not the user's fault; don't charge them for it
+            bucket.refund()
+            raise
+        self.admitted[lane] += 1
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def metrics(self) -> Dict:
+        """Snapshot of admission state and counters."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": dict(self.in_flight),
+            "queued": {lane: len(waiters) for lane, waiters in self.waiters.items()},
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "queue_wait_p95_seconds": self.queue_wait.p95(),
+            "tracked_users": len(self.buckets),
+        }
+
+# Create singleton instance
+admission_controller = AdmissionController()
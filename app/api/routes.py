@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
-from app.schemas.chat import ChatRequest, ChatResponse
+from app.schemas.chat import ChatRequest, ChatResponse, AdmissionMetrics
+from app.api.admission import admission_controller
 from app.rag.pipeline import rag_pipeline
+from app.rag.conversation import ConversationState
+from app.db.analytics_store import InteractionRecord, analytics_store
 from app.core.logging import get_logger
 from app.core.config import settings
 from app.core.models import User, Token
@@ -12,8 +15,9 @@ from app.core.auth import (
     get_current_active_user
 )
 import uuid
+import time
 from typing import Dict, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 logger = get_logger()
@@ -22,6 +26,7 @@ class Session(BaseModel):
     created_at: datetime
     last_activity: datetime
     chat_history: List[Dict[str, str]]
+    retrieval_state: ConversationState = Field(default_factory=ConversationState)
 
 # In-memory session storage
 sessions: Dict[str, Session] = {}
@@ -68,12 +73,24 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
+@router.get("/admission/metrics", response_model=AdmissionMetrics)
+async def admission_metrics(current_user: User = Depends(get_current_active_user)):
+    return admission_controller.metrics()
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     current_user: User = Depends(get_current_active_user)
 ):
     """Handle chat requests."""
+    # Rate limit and bound concurrency before any model work; rejects with 429
+    # The lane comes from the authenticated user; the request may only downgrade it
+    lane = request.priority or current_user.admission_lane
+    async with admission_controller.admit(current_user.username, lane):
+        return await process_chat(request, current_user)
+
+async def process_chat(request: ChatRequest, current_user: User) -> ChatResponse:
+    """Run a chat turn against the session and RAG pipeline."""
     try:
         # Get or create session
         session_id = get_or_create_session(request.session_id)
@@ -82,12 +99,27 @@ async def chat(
         # Update session activity
         session.last_activity = datetime.now()
         
+        trace = InteractionRecord(
+            query=request.message,
+            session_id=session_id,
+            username=current_user.username,
+            first_turn=not session.chat_history
+        )
+        start = time.perf_counter()
+        
         # Generate response using RAG pipeline
         response = await rag_pipeline.generate_response(
             query=request.message,
-            chat_history=session.chat_history
+            chat_history=session.chat_history,
+            state=session.retrieval_state,
+            trace=trace
         )
         
+        # Persist the interaction off the request path
+        trace.answer = response
+        trace.latencies["total"] = time.perf_counter() - start
+        analytics_store.record(trace)
+        
         # Update chat history
         session.chat_history.append({
             "role": "user",
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, SecretStr
-from typing import Optional
+from typing import Literal, Optional
 from functools import lru_cache
 import secrets
 
@@ -25,11 +25,52 @@ class Settings(BaseSettings):
     # Qdrant Settings
     QDRANT_URL: str = Field(..., description="Qdrant server URL")
     QDRANT_API_KEY: Optional[SecretStr] = Field(None, description="Qdrant API key")
+
+    # Embedding Settings
+    EMBEDDING_MODEL: str = Field(default="all-MiniLM-L6-v2", description="Sentence embedding model")
+    EMBEDDING_DIMENSION: int = Field(default=384, description="Embedding size; must match the Qdrant collection")
+    EMBEDDING_BACKEND: Literal["torch", "onnx", "onnx-int8"] = Field(default="torch", description="Encoder backend")
+    EMBEDDING_NUM_THREADS: Optional[int] = Field(None, description="CPU threads for the encoder (backend default if unset)")
+    EMBEDDING_MAX_LENGTH: int = Field(default=256, description="Maximum tokens per text for the ONNX backend")
+    EMBEDDING_ONNX_DIR: str = Field(default="models/onnx", description="Cache directory for exported ONNX models")
     
     # Session Settings
     SESSION_TIMEOUT_MINUTES: int = Field(default=30, description="Session timeout in minutes")
     MAX_CHAT_HISTORY: int = Field(default=10, description="Maximum number of messages in chat history")
-    
+
+    # Admission Control Settings
+    ADMISSION_MAX_IN_FLIGHT: int = Field(default=16, description="Maximum concurrent chat requests")
+    ADMISSION_BATCH_MAX_IN_FLIGHT: int = Field(default=4, description="Maximum concurrent chat requests in the batch lane")
+    ADMISSION_INTERACTIVE_QUEUE_SIZE: int = Field(default=32, description="Interactive requests allowed to wait for a slot")
+    ADMISSION_BATCH_QUEUE_SIZE: int = Field(default=16, description="Batch requests allowed to wait for a slot")
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS: float = Field(default=2.0, description="Longest a request waits for a slot before a 429")
+    ADMISSION_RETRY_AFTER_SECONDS: float = Field(default=1.0, description="Retry-After sent when the server is busy")
+    RATE_LIMIT_PER_MINUTE: float = Field(default=30.0, description="Sustained chat requests per user per minute")
+    RATE_LIMIT_BURST: int = Field(default=10, description="Chat requests a user may burst above the sustained rate")
+
+    # Pipeline Settings
+    USF_TIMEOUT_SECONDS: float = Field(default=60.0, description="Timeout for USF API requests in seconds")
+    USF_WARMUP_ENABLED: bool = Field(default=True, description="Warm the USF connection while retrieval runs")
+    USF_WARMUP_TIMEOUT_SECONDS: float = Field(default=1.0, description="Timeout for the USF connection warmup request")
+    HEDGE_QDRANT_REQUESTS: bool = Field(default=False, description="Send a backup Qdrant search when the first exceeds its p95 latency")
+    HEDGE_USF_REQUESTS: bool = Field(default=False, description="Send a backup USF request when the first exceeds its p95 latency")
+    HEDGE_MIN_SAMPLES: int = Field(default=20, description="Latency samples required before hedging kicks in")
+    HEDGE_WINDOW_SIZE: int = Field(default=200, description="Number of recent latency samples used to estimate p95")
+
+    # Conversational Retrieval Settings
+    CONVERSATIONAL_RETRIEVAL: bool = Field(default=False, description="Retrieve with a rolling session embedding for follow-up questions")
+    CONVERSATION_QUERY_WEIGHT: float = Field(default=0.6, ge=0.0, le=1.0, description="Weight of the current turn in the rolling session embedding")
+    CONVERSATION_CANDIDATE_CACHE_SIZE: int = Field(default=20, description="Maximum reranked candidates kept per session for reuse")
+
+    # Analytics Settings
+    ANALYTICS_ENABLED: bool = Field(default=True, description="Persist chat traffic to the analytics store")
+    ANALYTICS_DB_PATH: str = Field(default="data/analytics.db", description="SQLite file for the analytics store")
+    ANALYTICS_BATCH_SIZE: int = Field(default=50, description="Maximum records written per transaction")
+    ANALYTICS_FLUSH_INTERVAL_SECONDS: float = Field(default=2.0, description="Maximum time a record waits before being written")
+    ANALYTICS_QUEUE_SIZE: int = Field(default=10000, description="Records buffered before new ones are dropped")
+    ANSWER_CACHE_ENABLED: bool = Field(default=True, description="Serve precomputed answers for frequent first-turn questions")
+    ANSWER_CACHE_MAX_AGE_HOURS: float = Field(default=24.0, description="Precomputed answers older than this are not served")
+
     # Model Configuration
     model_config = SettingsConfigDict(
         env_file=".env",
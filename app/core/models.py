@@ -1,11 +1,13 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 class User(BaseModel):
     username: str
     email: Optional[str] = None
     full_name: Optional[str] = None
     disabled: Optional[bool] = None
+    # Admission lane for this principal; integrations should be set to batch
+    admission_lane: Literal["interactive", "batch"] = "interactive"
 
 class UserInDB(User):
     hashed_password: str
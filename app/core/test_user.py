@@ -13,6 +13,7 @@ TEST_USER = {
     "email": "test@example.com",
     "full_name": "Test User",
     "disabled": False,
+    "admission_lane": "interactive",
     "hashed_password": get_password_hash("testpassword123")
 }
 
@@ -0,0 +1,218 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    session_id TEXT,
+    username TEXT,
+    query TEXT NOT NULL,
+    normalized_query TEXT NOT NULL,
+    doc_ids TEXT NOT NULL,
+    scores TEXT NOT NULL,
+    rerank_scores TEXT NOT NULL DEFAULT '[]',
+    latencies TEXT NOT NULL,
+    answer TEXT,
+    first_turn INTEGER NOT NULL DEFAULT 1,
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_normalized_query ON interactions (normalized_query);
+CREATE TABLE IF NOT EXISTS precomputed_answers (
+    normalized_query TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+# Columns added after the first release, applied to existing databases
+MIGRATIONS = {
+    "rerank_scores": "ALTER TABLE interactions ADD COLUMN rerank_scores TEXT NOT NULL DEFAULT '[]'",
+}
+
+def normalize_query(query: str) -> str:
+    """Canonical form used to group repeated questions."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+class InteractionRecord(BaseModel):
+    """One chat turn as seen by the pipeline."""
+    query: str
+    session_id: Optional[str] = None
+    username: Optional[str] = None
+    doc_ids: List[Any] = Field(default_factory=list)
+    scores: List[Optional[float]] = Field(default_factory=list)
+    rerank_scores: List[Optional[float]] = Field(default_factory=list)
+    latencies: Dict[str, float] = Field(default_factory=dict)
+    answer: Optional[str] = None
+    first_turn: bool = True
+    cached: bool = False
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class AnalyticsStore:
+    """Append-only SQLite log of chat traffic.
+
+    Records are queued by the request handler and written in batches by a
+    background thread, so the request path never touches the database.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or settings.ANALYTICS_DB_PATH
+        self.enabled = settings.ANALYTICS_ENABLED
+        self._queue: "queue.Queue[Optional[InteractionRecord]]" = queue.Queue(maxsize=settings.ANALYTICS_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        if not self.enabled:
+            logger.info("Analytics store disabled")
+            return
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with closing(self._connect()) as conn:
+                conn.executescript(SCHEMA)
+                self._migrate(conn)
+            self._writer = threading.Thread(target=self._run, name="analytics-writer", daemon=True)
+            self._writer.start()
+            logger.info(f"Initialized analytics store: {self.db_path}")
+        except Exception as e:
+            logger.error(f"Error initializing analytics store: {str(e)}")
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(interactions)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(statement)
+        conn.commit()
+
+    def record(self, record: InteractionRecord):
+        """Queue a record for writing; drops it if the writer is backed up."""
+        if self._writer is None:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            logger.warning("Analytics queue full, dropping record")
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                batch = [record]
+                stop = False
+                deadline = time.monotonic() + settings.ANALYTICS_FLUSH_INTERVAL_SECONDS
+                try:
+                    while len(batch) < settings.ANALYTICS_BATCH_SIZE:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                        if item is None:
+                            stop = True
+                            break
+                        batch.append(item)
+                except queue.Empty:
+                    pass
+                self._write_batch(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[InteractionRecord]):
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO interactions (created_at, session_id, username, query, normalized_query, "
+                    "doc_ids, scores, rerank_scores, latencies, answer, first_turn, cached) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            record.created_at.isoformat(),
+                            record.session_id,
+                            record.username,
+                            record.query,
+                            normalize_query(record.query),
+                            json.dumps(record.doc_ids, default=str),
+                            json.dumps(record.scores),
+                            json.dumps(record.rerank_scores),
+                            json.dumps(record.latencies),
+                            record.answer,
+                            int(record.first_turn),
+                            int(record.cached)
+                        )
+                        for record in batch
+                    ]
+                )
+            logger.debug(f"Wrote {len(batch)} analytics records")
+        except Exception as e:
+            logger.error(f"Error writing analytics batch: {str(e)}")
+
+    def close(self, timeout: float = 5.0):
+        """Flush queued records and stop the writer thread."""
+        if self._writer is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Analytics queue full at shutdown, unwritten records will be lost")
+            self._writer = None
+            return
+        self._writer.join(timeout)
+        self._writer = None
+
+    def top_queries(self, limit: int, min_hits: int = 2) -> List[Dict[str, Any]]:
+        """Return the most frequent first-turn questions."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT normalized_query, MAX(query), COUNT(*) AS hits FROM interactions "
+                "WHERE first_turn = 1 GROUP BY normalized_query HAVING hits >= ? ORDER BY hits DESC LIMIT ?",
+                (min_hits, limit)
+            ).fetchall()
+        return [{"normalized_query": row[0], "query": row[1], "hits": row[2]} for row in rows]
+
+    def save_precomputed_answers(self, answers: List[Dict[str, Any]]):
+        """Replace all stored answers with this run's answers."""
+        now = datetime.now().isoformat()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM precomputed_answers")
+            conn.executemany(
+                "INSERT OR REPLACE INTO precomputed_answers (normalized_query, query, answer, hits, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(a["normalized_query"], a["query"], a["answer"], a["hits"], now) for a in answers]
+            )
+
+    def load_precomputed_answers(self, max_age_hours: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Return answers newer than max_age_hours, keyed by normalized query."""
+        if not self.enabled:
+            return {}
+        max_age_hours = settings.ANSWER_CACHE_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT normalized_query, answer, created_at FROM precomputed_answers WHERE created_at >= ?",
+                (cutoff,)
+            ).fetchall()
+        return {row[0]: {"answer": row[1], "created_at": datetime.fromisoformat(row[2])} for row in rows}
+
+# Create singleton instance
+analytics_store = AnalyticsStore()
@@ -31,15 +31,28 @@ class QdrantManager:
                 self.client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=models.VectorParams(
-                        size=384,  # Size for all-MiniLM-L6-v2
+                        size=settings.EMBEDDING_DIMENSION,
                         distance=models.Distance.COSINE
                     )
                 )
                 logger.info(f"Created collection: {self.collection_name}")
+            else:
+                self._validate_collection()
         except Exception as e:
             logger.error(f"Error ensuring collection: {str(e)}")
             raise
 
+    def _validate_collection(self):
+        """Check the existing collection matches the configured embedding size."""
+        vectors = self.client.get_collection(self.collection_name).config.params.vectors
+        size = vectors.size if isinstance(vectors, models.VectorParams) else None
+        if size is not None and size != settings.EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"Collection {self.collection_name} stores {size}-dimensional vectors but "
+                f"EMBEDDING_DIMENSION is {settings.EMBEDDING_DIMENSION} ({settings.EMBEDDING_MODEL}). "
+                "Re-index into a new collection when switching embedding models."
+            )
+
     def add_documents(self, documents: List[Dict[str, Any]], embeddings: List[List[float]]):
         """Add documents to the collection."""
         try:
@@ -76,6 +89,7 @@ class QdrantManager:
             results = []
             for scored_point in search_result:
                 results.append({
+                    "id": scored_point.id,
                     "content": scored_point.payload.get("content", ""),
                     "source": scored_point.payload.get("source", "unknown"),
                     "score": scored_point.score,
@@ -0,0 +1,103 @@
+"""Compare embedding backends on encode throughput and single-query latency.
+
+    python -m app.evaluation.benchmark_encoders --backends torch onnx onnx-int8 --threads 4
+
+Agreement is the mean cosine similarity to the first backend's embeddings,
+a quick check that a faster backend still retrieves the same documents.
+"""
+import argparse
+import time
+from typing import List, Dict, Any
+import numpy as np
+from app.rag.encoders import BACKENDS, build_encoder
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger()
+
+SAMPLE_QUERIES = [
+    "How do I reset my password?",
+    "My order has not arrived yet, what should I do?",
+    "Can I change the shipping address after placing an order?",
+    "How do I cancel my subscription?",
+    "The app crashes when I open the settings page on Android",
+    "What payment methods do you accept?",
+    "How long does a refund take to show up on my card?",
+    "I was charged twice for the same order",
+]
+
+def benchmark_backend(backend: str, model_name: str, threads: int, texts: List[str],
+                      batch_size: int, repeats: int) -> Dict[str, Any]:
+    """Measure batch throughput and single-query latency for one backend."""
+    start = time.perf_counter()
+    encoder = build_encoder(backend, model_name, threads)
+    load_seconds = time.perf_counter() - start
+
+    # Warm up kernels and caches
+    encoder.encode(texts[:batch_size], batch_size=batch_size)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        embeddings = encoder.encode(texts, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    latencies = []
+    for text in texts[:min(len(texts), 200)]:
+        start = time.perf_counter()
+        encoder.encode(text)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "texts_per_second": len(texts) * repeats / batch_seconds,
+        "query_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "query_p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "queries_per_second": len(latencies) / sum(latencies),
+        "embeddings": np.asarray(embeddings, dtype=np.float32),
+    }
+
+def agreement(reference: np.ndarray, embeddings: np.ndarray) -> float:
+    """Mean cosine similarity between matching rows."""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return float(np.mean(np.sum(reference * embeddings, axis=1)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_NUM_THREADS or 0,
+                        help="CPU threads per backend (0 keeps the backend default)")
+    parser.add_argument("--num-texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] + f" (#{i})" for i in range(args.num_texts)]
+
+    results = []
+    for backend in args.backends:
+        logger.info(f"Benchmarking {backend} backend")
+        try:
+            results.append(benchmark_backend(
+                backend, args.model, args.threads or None, texts, args.batch_size, args.repeats
+            ))
+        except Exception as e:
+            logger.error(f"Skipping {backend}: {str(e)}")
+
+    if not results:
+        return
+    reference = results[0]["embeddings"]
+    header = f"{'backend':<10} {'load s':>8} {'texts/s':>10} {'query/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'agreement':>10}"
+    print(f"Model: {args.model}, threads: {args.threads or 'default'}")
+    print(header)
+    for result in results:
+        print(
+            f"{result['backend']:<10} {result['load_seconds']:>8.2f} {result['texts_per_second']:>10.1f} "
+            f"{result['queries_per_second']:>10.1f} {result['query_p50_ms']:>8.2f} {result['query_p95_ms']:>8.2f} "
+            f"{agreement(reference, result['embeddings']):>10.4f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Precompute answers for the most frequent first-turn questions.
+
+Run offline, e.g. from cron:
+
+    python -m app.jobs.precompute_answers --top-n 100
+
+Each run replaces the previously stored answers. The API server loads them
+into its answer cache on startup and stops serving them once they are older
+than ANSWER_CACHE_MAX_AGE_HOURS, so schedule the job more often than that and
+restart the server to pick up a new run.
+"""
+import argparse
+import asyncio
+from app.db.analytics_store import analytics_store
+from app.rag.pipeline import rag_pipeline
+from app.core.logging import get_logger
+
+logger = get_logger()
+
+async def precompute_answers(top_n: int, min_hits: int):
+    """Answer the top_n most frequent questions and store the results."""
+    if not analytics_store.enabled:
+        logger.error("Analytics store is disabled; nothing to precompute")
+        return
+
+    questions = analytics_store.top_queries(top_n, min_hits=min_hits)
+    logger.info(f"Precomputing answers for {len(questions)} questions")
+
+    answers = []
+    try:
+        for question in questions:
+            try:
+                answer = await rag_pipeline.generate_response(question["query"], use_cache=False)
+            except Exception as e:
+                logger.error(f"Skipping '{question['query']}': {str(e)}")
+                continue
+            answers.append({**question, "answer": answer})
+    finally:
+        await rag_pipeline.close()
+
+    analytics_store.save_precomputed_answers(answers)
+    logger.info(f"Stored {len(answers)} precomputed answers")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top-n", type=int, default=100, help="Number of frequent questions to answer")
+    parser.add_argument("--min-hits", type=int, default=2, help="Minimum times a question must have been asked")
+    args = parser.parse_args()
+    asyncio.run(precompute_answers(args.top_n, args.min_hits))
+    analytics_store.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
+from app.rag.pipeline import rag_pipeline
+from app.rag.answer_cache import answer_cache
+from app.db.analytics_store import analytics_store
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -23,6 +26,17 @@ app.add_middleware(
 # Include routers
 app.include_router(router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def startup():
+    """Load precomputed answers."""
+    answer_cache.load()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections and flush analytics."""
+    await rag_pipeline.close()
+    analytics_store.close()
+
 @app.get("/")
 async def root():
     """Root endpoint."""
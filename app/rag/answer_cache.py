@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from app.db.analytics_store import analytics_store, normalize_query
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger()
+
+class AnswerCache:
+    """Precomputed answers for frequent first-turn questions.
+
+    Answers are loaded on startup and expire ANSWER_CACHE_MAX_AGE_HOURS after
+    the precompute job produced them, so a long-running server falls back to
+    the RAG pipeline rather than serving stale answers.
+    """
+
+    def __init__(self):
+        self.answers: Dict[str, Dict[str, Any]] = {}
+
+    def load(self):
+        """Load answers produced by the precompute job."""
+        if not settings.ANSWER_CACHE_ENABLED:
+            return
+        try:
+            self.answers = analytics_store.load_precomputed_answers()
+            logger.info(f"Loaded {len(self.answers)} precomputed answers")
+        except Exception as e:
+            logger.error(f"Error loading precomputed answers: {str(e)}")
+
+    def get(self, query: str) -> Optional[str]:
+        """Return the cached answer for query, if any and not expired."""
+        if not settings.ANSWER_CACHE_ENABLED:
+            return None
+        key = normalize_query(query)
+        entry = self.answers.get(key)
+        if entry is None:
+            return None
+        if datetime.now() - entry["created_at"] > timedelta(hours=settings.ANSWER_CACHE_MAX_AGE_HOURS):
+            self.answers.pop(key, None)
+            return None
+        return entry["answer"]
+
+# Create singleton instance
+answer_cache = AnswerCache()
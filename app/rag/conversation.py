@@ -0,0 +1,51 @@
+from typing import List, Dict, Any, Optional
+import hashlib
+import numpy as np
+from pydantic import BaseModel, Field
+from app.core.config import settings
+
+class ScoredCandidate(BaseModel):
+    document: Dict[str, Any]
+    rerank_score: float
+    # Cross-encoder scores are only comparable for the same query
+    scored_query: str
+
+class ConversationState(BaseModel):
+    """Per-session retrieval state carried between turns."""
+    embedding: Optional[List[float]] = None
+    last_query: Optional[str] = None
+    candidates: Dict[str, ScoredCandidate] = Field(default_factory=dict)
+
+def candidate_key(document: Dict[str, Any]) -> str:
+    """Stable identity for a retrieved document."""
+    doc_id = document.get("metadata", {}).get("id")
+    if doc_id is not None:
+        return str(doc_id)
+    return hashlib.sha1(document.get("content", "").encode("utf-8")).hexdigest()
+
+def mix_embeddings(previous: Optional[List[float]], current: List[float], weight: Optional[float] = None) -> List[float]:
+    """Blend the current turn into the rolling session embedding.
+
+    An exponential moving average, so older turns fade geometrically. The
+    result is re-normalised to keep cosine scores comparable.
+    """
+    if previous is None or len(previous) != len(current):
+        return list(current)
+    weight = settings.CONVERSATION_QUERY_WEIGHT if weight is None else weight
+    mixed = weight * np.asarray(current, dtype=np.float32) + (1.0 - weight) * np.asarray(previous, dtype=np.float32)
+    norm = np.linalg.norm(mixed)
+    if norm > 0:
+        mixed = mixed / norm
+    return mixed.tolist()
+
+def contextual_query(state: ConversationState, query: str) -> str:
+    """Prefix the previous question so follow-ups are scored in context."""
+    if state.last_query:
+        return f"{state.last_query}\n{query}"
+    return query
+
+def trim_candidates(candidates: Dict[str, ScoredCandidate], limit: Optional[int] = None) -> Dict[str, ScoredCandidate]:
+    """Keep only the highest scoring candidates."""
+    limit = settings.CONVERSATION_CANDIDATE_CACHE_SIZE if limit is None else limit
+    ranked = sorted(candidates.items(), key=lambda item: item[1].rerank_score, reverse=True)
+    return dict(ranked[:limit])
@@ -1,4 +1,4 @@
-from sentence_transformers import SentenceTransformer
+from app.rag.encoders import build_encoder
 from app.core.logging import get_logger
 from app.core.config import settings
 from typing import List
@@ -8,10 +8,16 @@ logger = get_logger()
 
 class EmbeddingManager:
     def __init__(self):
-        self.model_name = "all-MiniLM-L6-v2"
+        self.model_name = settings.EMBEDDING_MODEL
+        self.backend = settings.EMBEDDING_BACKEND
         try:
-            self.model = SentenceTransformer(self.model_name)
-            logger.info(f"Initialized embedding model: {self.model_name}")
+            self.model = build_encoder(self.backend, self.model_name, settings.EMBEDDING_NUM_THREADS)
+            if self.model.dimension != settings.EMBEDDING_DIMENSION:
+                raise ValueError(
+                    f"Embedding model {self.model_name} produces {self.model.dimension}-dimensional vectors "
+                    f"but EMBEDDING_DIMENSION is {settings.EMBEDDING_DIMENSION}"
+                )
+            logger.info(f"Initialized embedding model: {self.model_name} ({self.backend} backend)")
         except Exception as e:
             logger.error(f"Error initializing embedding model: {str(e)}")
             raise
@@ -37,4 +43,4 @@ class EmbeddingManager:
             raise
 
 # Create singleton instance
-embedding_manager = EmbeddingManager() 
\ No newline at end of file
+embedding_manager = EmbeddingManager()
@@ -0,0 +1,213 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import List, Optional, Union
+import numpy as np
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger()
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+class TorchEncoder:
+    """sentence-transformers on PyTorch."""
+
+    def __init__(self, model_name: str, num_threads: Optional[int] = None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+class OnnxEncoder:
+    """ONNX Runtime on CPU, optionally with int8 dynamically quantized weights.
+
+    The model is exported from its Hugging Face checkpoint on first use and
+    cached under EMBEDDING_ONNX_DIR. Pooling and normalisation follow the
+    model's sentence-transformers config so vectors match the torch backend;
+    models with other modules (e.g. Dense layers) are rejected.
+    """
+
+    def __init__(self, model_name: str, num_threads: Optional[int] = None, quantize: bool = False):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The ONNX embedding backend requires onnxruntime: pip install onnxruntime") from e
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = settings.EMBEDDING_MAX_LENGTH
+        self.tokenizer = AutoTokenizer.from_pretrained(self._hub_name(model_name))
+        self.pooling, self.normalize = self._load_pooling_config()
+        model_path = self._ensure_model(quantize)
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    @staticmethod
+    def _hub_name(model_name: str) -> str:
+        # sentence-transformers accepts bare names for its own models
+        if "/" in model_name or os.path.isdir(model_name):
+            return model_name
+        return f"sentence-transformers/{model_name}"
+
+    def _read_model_file(self, filename: str) -> dict:
+        name = self._hub_name(self.model_name)
+        if os.path.isdir(name):
+            path = os.path.join(name, filename)
+        else:
+            from huggingface_hub import hf_hub_download
+
+            path = hf_hub_download(name, filename)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load_pooling_config(self):
+        """Return (pooling mode, normalize) from the sentence-transformers config."""
+        try:
+            modules = self._read_model_file("modules.json")
+        except Exception as e:
+            raise ValueError(
+                f"{self.model_name} has no sentence-transformers modules.json; "
+                "cannot determine pooling for the ONNX backend"
+            ) from e
+
+        pooling, normalize = None, False
+        for module in modules:
+            module_type = module["type"].rsplit(".", 1)[-1]
+            if module_type == "Transformer":
+                continue
+            if module_type == "Pooling":
+                config = self._read_model_file(f"{module['path']}/config.json")
+                modes = [mode for mode in ("cls_token", "mean_tokens", "max_tokens")
+                         if config.get(f"pooling_mode_{mode}")]
+                other = [key for key, value in config.items()
+                         if key.startswith("pooling_mode_") and value and key[len("pooling_mode_"):] not in modes]
+                if len(modes) != 1 or other:
+                    raise ValueError(f"Unsupported pooling config for the ONNX backend: {config}")
+                pooling = modes[0]
+            elif module_type == "Normalize":
+                normalize = True
+            else:
+                raise ValueError(f"Module {module['type']} in {self.model_name} is not supported by the ONNX backend")
+        if pooling is None:
+            raise ValueError(f"{self.model_name} has no Pooling module")
+        return pooling, normalize
+
+    def _ensure_model(self, quantize: bool) -> str:
+        model_dir = os.path.join(settings.EMBEDDING_ONNX_DIR, self._hub_name(self.model_name).replace("/", "__"))
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(fp32_path):
+            os.makedirs(model_dir, exist_ok=True)
+            self._export(fp32_path)
+        if not quantize:
+            return fp32_path
+
+        int8_path = os.path.join(model_dir, "model.int8.onnx")
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"Quantizing {fp32_path} to int8")
+            with self._atomic_path(int8_path) as tmp_path:
+                quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        return int8_path
+
+    @staticmethod
+    @contextmanager
+    def _atomic_path(path: str):
+        """Yield a temporary path next to path and move it into place on success.
+
+        Keeps a crash or a concurrent worker from leaving a truncated model
+        that later starts would accept.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            yield tmp_path
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _export(self, path: str):
+        import torch
+        from transformers import AutoModel
+
+        logger.info(f"Exporting {self.model_name} to ONNX at {path}")
+        model = AutoModel.from_pretrained(self._hub_name(self.model_name))
+        model.eval()
+        sample = self.tokenizer(["export"], return_tensors="pt")
+        input_names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        with torch.no_grad(), self._atomic_path(path) as tmp_path:
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                tmp_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            feeds = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+
+            batches.append(self._pool(hidden, tokens["attention_mask"]))
+
+        embeddings = np.concatenate(batches) if batches else np.empty((0, self.dimension), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        mask = attention_mask[..., None].astype(np.float32)
+        if self.pooling == "cls_token":
+            pooled = hidden[:, 0]
+        elif self.pooling == "max_tokens":
+            pooled = np.where(mask > 0, hidden, -1e9).max(axis=1)
+        else:
+            # Mean over non-padding tokens
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+def build_encoder(backend: Optional[str] = None, model_name: Optional[str] = None, num_threads: Optional[int] = None):
+    """Create the encoder for the given backend, defaulting to Settings."""
+    backend = backend or settings.EMBEDDING_BACKEND
+    model_name = model_name or settings.EMBEDDING_MODEL
+    num_threads = num_threads if num_threads is not None else settings.EMBEDDING_NUM_THREADS
+
+    if backend == "torch":
+        return TorchEncoder(model_name, num_threads)
+    if backend == "onnx":
+        return OnnxEncoder(model_name, num_threads)
+    if backend == "onnx-int8":
+        return OnnxEncoder(model_name, num_threads, quantize=True)
+    raise ValueError(f"Unknown embedding backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
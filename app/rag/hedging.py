@@ -0,0 +1,72 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+class LatencyTracker:
+    def __init__(self, name: str, window_size: Optional[int] = None, min_samples: Optional[int] = None):
+        self.name = name
+        self.min_samples = min_samples if min_samples is not None else settings.HEDGE_MIN_SAMPLES
+        self.samples: Deque[float] = deque(maxlen=window_size or settings.HEDGE_WINDOW_SIZE)
+
+    def record(self, seconds: float):
+        """Record the latency of a completed call."""
+        self.samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        """Return the 95th percentile latency, or None until enough samples exist."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+        return ordered[index]
+
+async def _timed(call: Callable[[], Awaitable[T]], tracker: LatencyTracker) -> T:
+    start = time.perf_counter()
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        # A losing attempt took at least this long; dropping it would bias p95 down
+        tracker.record(time.perf_counter() - start)
+        raise
+    tracker.record(time.perf_counter() - start)
+    return result
+
+async def hedged(call: Callable[[], Awaitable[T]], tracker: LatencyTracker, enabled: bool = True) -> T:
+    """Run call, firing a backup attempt if the first one outlives the tracked p95.
+
+    The first attempt to succeed wins and the other is cancelled. Hedging stays
+    off until the tracker has enough samples to estimate a p95. If the caller
+    is cancelled, every attempt still running is cancelled with it.
+    """
+    threshold = tracker.p95() if enabled else None
+    if threshold is None:
+        return await _timed(call, tracker)
+
+    primary = asyncio.ensure_future(_timed(call, tracker))
+    backup: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done:
+            return primary.result()
+
+        logger.debug(f"Hedging {tracker.name} request after {threshold:.3f}s")
+        backup = asyncio.ensure_future(_timed(call, tracker))
+        pending = {primary, backup}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+        # Both attempts failed; surface the primary's error
+        return primary.result()
+    finally:
+        for task in (primary, backup):
+            if task is not None and not task.done():
+                task.cancel()
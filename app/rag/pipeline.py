@@ -1,14 +1,33 @@
 from typing import List, Dict, Any, Optional
+import asyncio
+import time
 import httpx
 from app.rag.embeddings import embedding_manager
 from app.db.qdrant_client import qdrant_manager
 from app.rag.reranker import reranker
+from app.rag.hedging import LatencyTracker, hedged
+from app.rag.answer_cache import answer_cache
+from app.db.analytics_store import InteractionRecord
+from app.rag.conversation import (
+    ConversationState,
+    ScoredCandidate,
+    candidate_key,
+    contextual_query,
+    mix_embeddings,
+    trim_candidates
+)
 from app.core.logging import get_logger
 from app.core.config import settings
 from pydantic import BaseModel
 
 logger = get_logger()
 
+# httpx drops idle pooled connections after this many seconds
+KEEPALIVE_EXPIRY_SECONDS = 5.0
+
+# Number of documents passed to the LLM as context
+RERANK_TOP_K = 3
+
 class Document(BaseModel):
     content: str
     metadata: Dict[str, Any]
@@ -18,90 +37,259 @@ class RAGPipeline:
         self.api_url = settings.USF_API_URL
         self.api_key = settings.USF_API_KEY.get_secret_value()
         self.model = settings.USF_MODEL
+        self.qdrant_latency = LatencyTracker("qdrant")
+        self.usf_latency = LatencyTracker("usf")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._last_usf_activity = 0.0
         logger.info(f"Initialized RAG pipeline with model: {self.model}")
 
-    def get_relevant_documents(self, query: str) -> List[Document]:
-        """Retrieve and rerank relevant documents for the query."""
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client so USF connections are pooled across requests."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.USF_TIMEOUT_SECONDS,
+                limits=httpx.Limits(keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS)
+            )
+        return self._client
+
+    async def close(self):
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def warm_connection(self):
+        """Open a pooled connection to USF so the LLM call skips TCP/TLS setup."""
+        if not settings.USF_WARMUP_ENABLED:
+            return
+        if time.monotonic() - self._last_usf_activity < KEEPALIVE_EXPIRY_SECONDS:
+            return
+        # Claim the warmup up front so concurrent requests don't each send a HEAD
+        self._last_usf_activity = time.monotonic()
+        try:
+            await self.client.head(
+                self.api_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(settings.USF_WARMUP_TIMEOUT_SECONDS)
+            )
+            self._last_usf_activity = time.monotonic()
+        except Exception as e:
+            # Warming is best effort; the real request will report failures
+            self._last_usf_activity = 0.0
+            logger.debug(f"USF connection warmup failed: {str(e)}")
+
+    async def search_documents(self, query_embedding: List[float]) -> List[Dict[str, Any]]:
+        """Search Qdrant, hedging slow calls when enabled."""
+        return await hedged(
+            lambda: asyncio.to_thread(qdrant_manager.search, query_embedding),
+            self.qdrant_latency,
+            enabled=settings.HEDGE_QDRANT_REQUESTS
+        )
+
+    async def rerank_with_cache(self, query: str, documents: List[Document], state: ConversationState) -> List[Dict[str, Any]]:
+        """Rerank every search hit against the conversation.
+
+        A cached score is reused only when it was computed for the identical
+        rerank query (the same question following the same previous question);
+        all other hits are scored afresh so every score in the ranking is for
+        the current query.
+        """
+        rerank_query = contextual_query(state, query)
+
+        pool: Dict[str, Dict[str, Any]] = {}
+        for doc in documents:
+            doc_dict = doc.model_dump()
+            pool.setdefault(candidate_key(doc_dict), doc_dict)
+
+        scored: Dict[str, ScoredCandidate] = {}
+        for key in pool:
+            cached = state.candidates.get(key)
+            if cached is not None and cached.scored_query == rerank_query:
+                scored[key] = cached
+
+        score_keys = [key for key in pool if key not in scored]
+        if score_keys:
+            scores = await asyncio.to_thread(reranker.score, rerank_query, [pool[key] for key in score_keys])
+            for key, score in zip(score_keys, scores):
+                scored[key] = ScoredCandidate(document=pool[key], rerank_score=score, scored_query=rerank_query)
+        logger.debug(f"Scored {len(score_keys)} of {len(pool)} candidates")
+
+        state.candidates = trim_candidates(scored)
+        ranked = sorted(scored, key=lambda key: scored[key].rerank_score, reverse=True)
+        return [
+            {**pool[key], "metadata": {**pool[key]["metadata"], "rerank_score": scored[key].rerank_score}}
+            for key in ranked[:RERANK_TOP_K]
+        ]
+
+    async def get_relevant_documents(
+        self,
+        query: str,
+        state: Optional[ConversationState] = None,
+        trace: Optional[InteractionRecord] = None
+    ) -> List[Document]:
+        """Retrieve and rerank relevant documents for the query.
+
+        When a conversation state is given, search uses the rolling session
+        embedding and reranking is done against the conversation context.
+        """
         try:
+            conversational = state is not None and settings.CONVERSATIONAL_RETRIEVAL
+            latencies: Dict[str, float] = {}
+
             # Generate query embedding
-            query_embedding = embedding_manager.get_embedding(query)
-            
+            start = time.perf_counter()
+            query_embedding = await asyncio.to_thread(embedding_manager.get_embedding, query)
+            if conversational:
+                query_embedding = mix_embeddings(state.embedding, query_embedding)
+            latencies["embed"] = time.perf_counter() - start
+
             # Search for relevant documents
-            search_results = qdrant_manager.search(query_embedding)
-            
+            start = time.perf_counter()
+            search_results = await self.search_documents(query_embedding)
+            latencies["search"] = time.perf_counter() - start
+
             # Format results
             documents = []
             for result in search_results:
                 documents.append(Document(
-                    content=result.payload.get("content", ""),
+                    content=result.get("content", ""),
                     metadata={
-                        "source": result.payload.get("source", "unknown"),
-                        "score": result.score
+                        "id": result.get("id"),
+                        "source": result.get("source", "unknown"),
+                        "score": result.get("score")
                     }
                 ))
-            
+
             # Rerank documents
-            reranked_docs = reranker.rerank(query, [doc.dict() for doc in documents])
-            
+            start = time.perf_counter()
+            if conversational:
+                reranked_docs = await self.rerank_with_cache(query, documents, state)
+                state.embedding = query_embedding
+                state.last_query = query
+            else:
+                reranked_docs = await asyncio.to_thread(
+                    reranker.rerank, query, [doc.model_dump() for doc in documents], RERANK_TOP_K
+                )
+            latencies["rerank"] = time.perf_counter() - start
+
+            if trace is not None:
+                trace.latencies.update(latencies)
+                trace.doc_ids = [doc["metadata"].get("id") for doc in reranked_docs]
+                trace.scores = [doc["metadata"].get("score") for doc in reranked_docs]
+                trace.rerank_scores = [doc["metadata"].get("rerank_score") for doc in reranked_docs]
+
             # Convert back to Document objects
             return [Document(**doc) for doc in reranked_docs]
         except Exception as e:
             logger.error(f"Error retrieving documents: {str(e)}")
             raise
 
-    async def generate_response(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> str:
-        """Generate response using RAG pipeline."""
+    async def seed_state(self, query: str, state: Optional[ConversationState]):
+        """Record a turn answered without retrieval so follow-ups keep its context."""
+        if state is None or not settings.CONVERSATIONAL_RETRIEVAL:
+            return
+        query_embedding = await asyncio.to_thread(embedding_manager.get_embedding, query)
+        state.embedding = mix_embeddings(state.embedding, query_embedding)
+        state.last_query = query
+
+    def prepare_history(self, chat_history: Optional[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        """Trim chat history to the configured window."""
+        if not chat_history:
+            return []
+        return list(chat_history[-settings.MAX_CHAT_HISTORY:])
+
+    def build_messages(self, query: str, history: List[Dict[str, str]], documents: List[Document]) -> List[Dict[str, str]]:
+        """Assemble the USF message list from history and retrieved context."""
+        # Create context from documents
+        context = "\n".join([doc.content for doc in documents])
+
+        messages = list(history)
+
+        # Add system message with context
+        messages.append({
+            "role": "system",
+            "content": f"Use the following context to answer the user's question:\n\n{context}"
+        })
+
+        # Add user message
+        messages.append({
+            "role": "user",
+            "content": query
+        })
+        return messages
+
+    async def call_llm(self, messages: List[Dict[str, str]]) -> str:
+        """Send messages to the USF API and return the answer text."""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.1,
+            "stream": False,
+            "max_tokens": 1024
+        }
+
+        async def post() -> Dict[str, Any]:
+            response = await self.client.post(
+                self.api_url,
+                json=payload,
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+            response.raise_for_status()
+            return response.json()
+
+        result = await hedged(post, self.usf_latency, enabled=settings.HEDGE_USF_REQUESTS)
+        self._last_usf_activity = time.monotonic()
+
+        # Extract the response text
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"].strip()
+        raise ValueError("Invalid response format from USF API")
+
+    async def generate_response(
+        self,
+        query: str,
+        chat_history: Optional[List[Dict[str, str]]] = None,
+        state: Optional[ConversationState] = None,
+        trace: Optional[InteractionRecord] = None,
+        use_cache: bool = True
+    ) -> str:
+        """Generate response using RAG pipeline.
+
+        Retrieval (embed -> search -> rerank) runs in worker threads while the
+        event loop trims history and warms the USF connection. Once retrieval
+        is done the LLM call waits at most USF_WARMUP_TIMEOUT_SECONDS for an
+        unfinished warmup, so the POST can reuse the warmed connection instead
+        of redoing the TCP/TLS handshake. First-turn questions with a
+        precomputed answer skip everything but embedding the query into the
+        conversation state.
+        """
+        if use_cache and not chat_history:
+            cached_answer = answer_cache.get(query)
+            if cached_answer is not None:
+                await self.seed_state(query, state)
+                if trace is not None:
+                    trace.cached = True
+                return cached_answer
+
+        retrieval = asyncio.create_task(self.get_relevant_documents(query, state, trace))
+        warmup = asyncio.create_task(self.warm_connection())
         try:
-            # Get relevant documents
-            documents = self.get_relevant_documents(query)
-            
-            # Create context from documents
-            context = "\n".join([doc.content for doc in documents])
-            
-            # Prepare messages for USF API
-            messages = []
-            if chat_history:
-                messages.extend(chat_history)
-            
-            # Add system message with context
-            messages.append({
-                "role": "system",
-                "content": f"Use the following context to answer the user's question:\n\n{context}"
-            })
-            
-            # Add user message
-            messages.append({
-                "role": "user",
-                "content": query
-            })
-
-            # Prepare request payload
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": 0.1,
-                "stream": False,
-                "max_tokens": 1024
-            }
-
-            # Make request to USF API
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    json=payload,
-                    headers={"Authorization": f"Bearer {self.api_key}"}
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Extract the response text
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0]["message"]["content"].strip()
-                else:
-                    raise ValueError("Invalid response format from USF API")
+            history = self.prepare_history(chat_history)
+            documents = await retrieval
+            if not warmup.done():
+                await asyncio.wait({warmup}, timeout=settings.USF_WARMUP_TIMEOUT_SECONDS)
 
+            messages = self.build_messages(query, history, documents)
+            start = time.perf_counter()
+            answer = await self.call_llm(messages)
+            if trace is not None:
+                trace.latencies["llm"] = time.perf_counter() - start
+            return answer
         except Exception as e:
+            retrieval.cancel()
+            warmup.cancel()
             logger.error(f"Error generating response: {str(e)}")
             raise
 
-rag_pipeline = RAGPipeline() 
\ No newline at end of file
+rag_pipeline = RAGPipeline()
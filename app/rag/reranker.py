@@ -15,14 +15,25 @@ class Reranker:
             logger.error(f"Error initializing reranker model: {str(e)}")
             raise
 
-    def rerank(self, query: str, documents: List[Dict[str, Any]], top_k: int = 3) -> List[Dict[str, Any]]:
-        """Rerank documents based on relevance to the query."""
+    def score(self, query: str, documents: List[Dict[str, Any]]) -> List[float]:
+        """Score documents for relevance to the query."""
+        if not documents:
+            return []
         try:
             # Prepare document pairs for reranking
             pairs = [(query, doc["content"]) for doc in documents]
             
             # Get relevance scores
-            scores = self.model.predict(pairs)
+            return [float(score) for score in self.model.predict(pairs)]
+        except Exception as e:
+            logger.error(f"Error scoring documents: {str(e)}")
+            raise
+
+    def rerank(self, query: str, documents: List[Dict[str, Any]], top_k: int = 3) -> List[Dict[str, Any]]:
+        """Rerank documents based on relevance to the query."""
+        try:
+            # Get relevance scores
+            scores = self.score(query, documents)
             
             # Combine documents with scores
             scored_docs = list(zip(documents, scores))
@@ -30,8 +41,11 @@ class Reranker:
             # Sort by score in descending order
             scored_docs.sort(key=lambda x: x[1], reverse=True)
             
-            # Return top k documents
-            reranked_docs = [doc for doc, _ in scored_docs[:top_k]]
+            # Return top k documents with their scores
+            reranked_docs = [
+                {**doc, "metadata": {**doc.get("metadata", {}), "rerank_score": score}}
+                for doc, score in scored_docs[:top_k]
+            ]
             
             return reranked_docs
         except Exception as e:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 class ChatMessage(BaseModel):
@@ -10,6 +10,7 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str = Field(..., description="The user's message")
     session_id: Optional[str] = Field(None, description="Optional session ID for continuing conversation")
+    priority: Optional[Literal["batch"]] = Field(None, description="Set to batch to yield to interactive traffic; the lane otherwise comes from the user")
 
 class ChatResponse(BaseModel):
     response: str = Field(..., description="The assistant's response")
@@ -19,4 +20,13 @@ class ChatResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     error: str
-    detail: str = Field(..., description="Error message") 
\ No newline at end of file
+    detail: str = Field(..., description="Error message")
+
+class AdmissionMetrics(BaseModel):
+    max_in_flight: int
+    in_flight: Dict[str, int]
+    queued: Dict[str, int]
+    admitted: Dict[str, int]
+    rejected: Dict[str, int]
+    queue_wait_p95_seconds: Optional[float] = None
+    tracked_users: int
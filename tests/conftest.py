@@ -0,0 +1,8 @@
+import os
+
+# Settings are loaded at import time; give the required ones dummy values
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("USF_API_URL", "http://usf.test/v1/chat/completions")
+os.environ.setdefault("USF_API_KEY", "test-key")
+os.environ.setdefault("QDRANT_URL", "http://qdrant.test:6333")
+os.environ.setdefault("ANALYTICS_ENABLED", "false")
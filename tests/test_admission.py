@@ -0,0 +1,176 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.api import admission as admission_module
+from app.api.admission import BATCH, INTERACTIVE, AdmissionController
+
+@pytest.fixture
+def configure(monkeypatch):
+    """Set admission settings, then build a controller from them."""
+    def build(**overrides):
+        values = {
+            "ADMISSION_MAX_IN_FLIGHT": 2,
+            "ADMISSION_BATCH_MAX_IN_FLIGHT": 1,
+            "ADMISSION_INTERACTIVE_QUEUE_SIZE": 2,
+            "ADMISSION_BATCH_QUEUE_SIZE": 2,
+            "ADMISSION_MAX_QUEUE_WAIT_SECONDS": 1.0,
+            "RATE_LIMIT_PER_MINUTE": 60.0,
+            "RATE_LIMIT_BURST": 100,
+            **overrides,
+        }
+        for name, value in values.items():
+            monkeypatch.setattr(admission_module.settings, name, value)
+        return AdmissionController()
+    return build
+
+async def enter(controller, user_id, lane=INTERACTIVE):
+    """Enter an admission block and return the context manager holding the slot."""
+    slot = controller.admit(user_id, lane)
+    await slot.__aenter__()
+    return slot
+
+def test_rate_limit_rejects_burst_with_retry_after(configure):
+    controller = configure(RATE_LIMIT_BURST=2, RATE_LIMIT_PER_MINUTE=6.0)
+
+    async def main():
+        for _ in range(2):
+            async with controller.admit("alice"):
+                pass
+        with pytest.raises(HTTPException) as excinfo:
+            async with controller.admit("alice"):
+                pass
+        assert excinfo.value.status_code == 429
+        assert excinfo.value.headers["Retry-After"] == "10"
+        # Other users have their own bucket
+        async with controller.admit("bob"):
+            pass
+
+    asyncio.run(main())
+    assert controller.rejected["rate_limited"] == 1
+
+def test_batch_lane_limit_and_interactive_priority(configure):
+    controller = configure()
+
+    async def main():
+        batch = await enter(controller, "a", BATCH)
+        # The batch lane is full, but interactive work still gets the other slot
+        queued_batch = asyncio.ensure_future(enter(controller, "b", BATCH))
+        await asyncio.sleep(0)
+        interactive = await enter(controller, "c")
+        queued_interactive = asyncio.ensure_future(enter(controller, "d"))
+        await asyncio.sleep(0)
+        assert controller.metrics()["queued"] == {INTERACTIVE: 1, BATCH: 1}
+
+        # A freed batch slot goes to the interactive waiter first
+        await batch.__aexit__(None, None, None)
+        second = await queued_interactive
+        assert not queued_batch.done()
+
+        await interactive.__aexit__(None, None, None)
+        queued = await queued_batch
+        assert controller.in_flight == {INTERACTIVE: 1, BATCH: 1}
+        for slot in (second, queued):
+            await slot.__aexit__(None, None, None)
+
+    asyncio.run(main())
+    assert controller.in_flight == {INTERACTIVE: 0, BATCH: 0}
+
+def test_full_queue_rejects_and_refunds_token(configure):
+    controller = configure(ADMISSION_MAX_IN_FLIGHT=1, ADMISSION_INTERACTIVE_QUEUE_SIZE=0, RATE_LIMIT_BURST=1)
+
+    async def main():
+        held = await enter(controller, "a")
+        with pytest.raises(HTTPException) as excinfo:
+            await enter(controller, "b")
+        assert excinfo.value.status_code == 429
+        await held.__aexit__(None, None, None)
+        # b's only token was refunded, so b is not rate limited now
+        async with controller.admit("b"):
+            pass
+
+    asyncio.run(main())
+    assert controller.rejected == {"rate_limited": 0, "queue_full": 1, "queue_timeout": 0}
+
+def test_queue_timeout_rejects_and_refunds_token(configure):
+    controller = configure(ADMISSION_MAX_IN_FLIGHT=1, ADMISSION_MAX_QUEUE_WAIT_SECONDS=0.01, RATE_LIMIT_BURST=1)
+
+    async def main():
+        held = await enter(controller, "a")
+        with pytest.raises(HTTPException):
+            await enter(controller, "b")
+        assert controller.metrics()["queued"][INTERACTIVE] == 0
+        await held.__aexit__(None, None, None)
+        async with controller.admit("b"):
+            pass
+
+    asyncio.run(main())
+    assert controller.rejected["queue_timeout"] == 1
+    assert controller.in_flight[INTERACTIVE] == 0
+
+def test_slot_handed_over_as_timeout_fires_is_kept(configure, monkeypatch):
+    controller = configure(ADMISSION_MAX_IN_FLIGHT=1)
+
+    async def main():
+        held = await enter(controller, "a")
+
+        async def racing_wait_for(waiter, timeout):
+            # The holder releases just as the wait times out
+            await held.__aexit__(None, None, None)
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(admission_module.asyncio, "wait_for", racing_wait_for)
+        slot = await enter(controller, "b")
+        assert controller.in_flight[INTERACTIVE] == 1
+        await slot.__aexit__(None, None, None)
+
+    asyncio.run(main())
+    assert controller.rejected["queue_timeout"] == 0
+    assert controller.in_flight[INTERACTIVE] == 0
+
+def test_cancelled_waiter_leaves_queue_and_refunds_token(configure):
+    controller = configure(ADMISSION_MAX_IN_FLIGHT=1, RATE_LIMIT_BURST=1)
+
+    async def main():
+        held = await enter(controller, "a")
+        waiting = asyncio.ensure_future(enter(controller, "b"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller.metrics()["queued"][INTERACTIVE] == 0
+        await held.__aexit__(None, None, None)
+        async with controller.admit("b"):
+            pass
+
+    asyncio.run(main())
+    assert controller.in_flight[INTERACTIVE] == 0
+
+def test_cancel_after_handover_does_not_leak_slot(configure, monkeypatch):
+    controller = configure(ADMISSION_MAX_IN_FLIGHT=1)
+
+    async def main():
+        held = await enter(controller, "a")
+
+        async def cancelled_wait_for(waiter, timeout):
+            # The slot is handed over, then the client goes away
+            await held.__aexit__(None, None, None)
+            raise asyncio.CancelledError
+
+        monkeypatch.setattr(admission_module.asyncio, "wait_for", cancelled_wait_for)
+        with pytest.raises(asyncio.CancelledError):
+            await enter(controller, "b")
+
+    asyncio.run(main())
+    assert controller.in_flight[INTERACTIVE] == 0
+
+def test_tracked_users_are_bounded_lru(configure, monkeypatch):
+    monkeypatch.setattr(admission_module, "MAX_TRACKED_USERS", 3)
+    controller = configure()
+
+    async def main():
+        for user_id in ("a", "b", "c", "a", "d"):
+            async with controller.admit(user_id):
+                pass
+
+    asyncio.run(main())
+    assert list(controller.buckets) == ["c", "a", "d"]
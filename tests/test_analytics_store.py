@@ -0,0 +1,64 @@
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+import pytest
+from app.db import analytics_store as analytics_module
+from app.db.analytics_store import AnalyticsStore, InteractionRecord
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_module.settings, "ANALYTICS_ENABLED", True)
+    monkeypatch.setattr(analytics_module.settings, "ANALYTICS_FLUSH_INTERVAL_SECONDS", 0.01)
+    store = AnalyticsStore(str(tmp_path / "analytics.db"))
+    yield store
+    store.close()
+
+def answer(query, text):
+    return {"normalized_query": query, "query": query, "answer": text, "hits": 3}
+
+def test_records_rerank_scores(store):
+    store.record(InteractionRecord(query="Reset?", doc_ids=[1, 2], scores=[0.8, 0.7], rerank_scores=[4.2, -1.0]))
+    store.close()
+    with closing(sqlite3.connect(store.db_path)) as conn:
+        row = conn.execute("SELECT scores, rerank_scores FROM interactions").fetchone()
+    assert json.loads(row[0]) == [0.8, 0.7]
+    assert json.loads(row[1]) == [4.2, -1.0]
+
+def test_existing_database_gains_rerank_scores_column(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "old.db")
+    old_schema = analytics_module.SCHEMA.replace("    rerank_scores TEXT NOT NULL DEFAULT '[]',\n", "")
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executescript(old_schema)
+    monkeypatch.setattr(analytics_module.settings, "ANALYTICS_ENABLED", True)
+    AnalyticsStore(db_path).close()
+    with closing(sqlite3.connect(db_path)) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(interactions)")}
+    assert "rerank_scores" in columns
+
+def test_precomputed_answers_expire(store):
+    store.save_precomputed_answers([answer("reset password", "Use the link.")])
+    stale = (datetime.now() - timedelta(hours=48)).isoformat()
+    with closing(sqlite3.connect(store.db_path)) as conn, conn:
+        conn.execute("UPDATE precomputed_answers SET created_at = ?", (stale,))
+    assert store.load_precomputed_answers(max_age_hours=24) == {}
+    assert store.load_precomputed_answers(max_age_hours=72)["reset password"]["answer"] == "Use the link."
+
+def test_save_replaces_previous_run(store):
+    store.save_precomputed_answers([answer("reset password", "old"), answer("billing", "old")])
+    store.save_precomputed_answers([answer("reset password", "new")])
+    answers = store.load_precomputed_answers()
+    assert {key: value["answer"] for key, value in answers.items()} == {"reset password": "new"}
+
+def test_answer_cache_stops_serving_expired_answers(monkeypatch):
+    from app.rag.answer_cache import AnswerCache
+
+    cache = AnswerCache()
+    cache.answers = {
+        "fresh": {"answer": "a", "created_at": datetime.now()},
+        "stale": {"answer": "b", "created_at": datetime.now() - timedelta(hours=2)},
+    }
+    monkeypatch.setattr(analytics_module.settings, "ANSWER_CACHE_MAX_AGE_HOURS", 1.0)
+    assert cache.get("Fresh?") == "a"
+    assert cache.get("stale") is None
+    assert "stale" not in cache.answers
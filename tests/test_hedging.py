@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from app.rag.hedging import LatencyTracker, hedged
+
+def make_tracker(latency: float = 0.05, samples: int = 5) -> LatencyTracker:
+    tracker = LatencyTracker("test", window_size=50, min_samples=samples)
+    for _ in range(samples):
+        tracker.record(latency)
+    return tracker
+
+def test_no_hedge_until_enough_samples():
+    tracker = LatencyTracker("test", window_size=50, min_samples=5)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    assert asyncio.run(hedged(call, tracker)) == "ok"
+    assert len(calls) == 1
+    assert len(tracker.samples) == 1
+
+def test_backup_wins_and_slow_primary_is_recorded():
+    tracker = make_tracker()
+    started = []
+
+    async def call():
+        attempt = len(started)
+        started.append(attempt)
+        await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        return attempt
+
+    assert asyncio.run(hedged(call, tracker)) == 1
+    assert len(started) == 2
+    # The cancelled primary leaves a censored sample at least as long as the threshold
+    assert max(tracker.samples) >= 0.05
+    assert len(tracker.samples) == 7
+
+def test_both_attempts_fail_raises_primary_error():
+    tracker = make_tracker(latency=0.01)
+    started = []
+
+    async def call():
+        attempt = len(started)
+        started.append(attempt)
+        await asyncio.sleep(0.05)
+        raise RuntimeError(f"attempt {attempt}")
+
+    with pytest.raises(RuntimeError, match="attempt 0"):
+        asyncio.run(hedged(call, tracker))
+
+@pytest.mark.parametrize("cancel_after", [0.02, 0.1])
+def test_caller_cancellation_cancels_attempts(cancel_after):
+    # 0.02s cancels during the first wait, 0.1s after the backup has started
+    tracker = make_tracker()
+    attempts = []
+
+    async def call():
+        attempts.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    async def main():
+        outer = asyncio.ensure_future(hedged(call, tracker))
+        await asyncio.sleep(cancel_after)
+        outer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await outer
+        await asyncio.sleep(0)
+        # Checked inside the loop; asyncio.run would cancel leftovers on exit
+        assert len(attempts) == (1 if cancel_after < 0.05 else 2)
+        assert all(task.done() for task in attempts)
+
+    asyncio.run(main())
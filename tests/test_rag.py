@@ -0,0 +1,118 @@
+import asyncio
+import importlib
+import sys
+import types
+import numpy as np
+import pytest
+from app.rag.conversation import (
+    ConversationState,
+    ScoredCandidate,
+    candidate_key,
+    mix_embeddings,
+    trim_candidates
+)
+
+class FakeEmbeddings:
+    def get_embedding(self, text):
+        return [1.0, 0.0] if "reset" in text else [0.0, 1.0]
+
+class FakeQdrant:
+    def __init__(self):
+        self.results = []
+        self.queries = []
+
+    def search(self, query_embedding, limit=5):
+        self.queries.append(query_embedding)
+        return self.results
+
+class FakeReranker:
+    def __init__(self):
+        self.calls = []
+
+    def score(self, query, documents):
+        self.calls.append((query, [doc["metadata"]["id"] for doc in documents]))
+        return [float(doc["metadata"]["id"]) for doc in documents]
+
+def hits(*ids):
+    return [{"id": i, "content": f"doc {i}", "source": "test", "score": 0.5} for i in ids]
+
+@pytest.fixture
+def rag(monkeypatch):
+    """Import the pipeline with model-backed singletons replaced by fakes."""
+    fakes = types.SimpleNamespace(qdrant=FakeQdrant(), reranker=FakeReranker())
+    stubs = {
+        "app.rag.embeddings": {"embedding_manager": FakeEmbeddings()},
+        "app.db.qdrant_client": {"qdrant_manager": fakes.qdrant},
+        "app.rag.reranker": {"reranker": fakes.reranker},
+    }
+    for name, attrs in stubs.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(attrs)
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "app.rag.pipeline", raising=False)
+    fakes.module = importlib.import_module("app.rag.pipeline")
+    fakes.pipeline = fakes.module.rag_pipeline
+    monkeypatch.setattr(fakes.module.settings, "CONVERSATIONAL_RETRIEVAL", True)
+    yield fakes
+    sys.modules.pop("app.rag.pipeline", None)
+
+def test_mix_embeddings_blends_and_normalises():
+    mixed = mix_embeddings([1.0, 0.0], [0.0, 1.0], weight=0.6)
+    assert np.isclose(np.linalg.norm(mixed), 1.0)
+    assert mixed[1] > mixed[0] > 0
+    assert mix_embeddings(None, [0.3, 0.4]) == [0.3, 0.4]
+    # A dimension change (new model) starts a fresh session embedding
+    assert mix_embeddings([1.0, 0.0, 0.0], [0.3, 0.4]) == [0.3, 0.4]
+
+def test_candidate_key_falls_back_to_content_hash():
+    assert candidate_key({"metadata": {"id": 7}, "content": "x"}) == "7"
+    assert candidate_key({"metadata": {"id": None}, "content": "x"}) == candidate_key({"metadata": {}, "content": "x"})
+
+def test_trim_candidates_keeps_best():
+    candidates = {
+        str(i): ScoredCandidate(document={}, rerank_score=float(i), scored_query="q") for i in range(5)
+    }
+    assert list(trim_candidates(candidates, limit=2)) == ["4", "3"]
+
+def test_follow_up_scores_every_hit_against_current_query(rag):
+    state = ConversationState()
+    rag.qdrant.results = hits(1, 2, 3, 4, 5)
+    asyncio.run(rag.pipeline.get_relevant_documents("how to reset", state))
+
+    rag.qdrant.results = hits(1, 2, 3, 4, 6)
+    docs = asyncio.run(rag.pipeline.get_relevant_documents("and on android", state))
+
+    query, scored_ids = rag.reranker.calls[-1]
+    assert query == "how to reset\nand on android"
+    assert sorted(scored_ids) == [1, 2, 3, 4, 6]
+    assert [doc.metadata["id"] for doc in docs] == [6, 4, 3]
+    assert all(c.scored_query == query for c in state.candidates.values())
+
+def test_follow_up_searches_with_mixed_embedding(rag):
+    state = ConversationState()
+    rag.qdrant.results = hits(1)
+    asyncio.run(rag.pipeline.get_relevant_documents("how to reset", state))
+    asyncio.run(rag.pipeline.get_relevant_documents("and on android", state))
+    assert rag.qdrant.queries[-1] == mix_embeddings([1.0, 0.0], [0.0, 1.0])
+
+def test_cached_scores_reused_only_for_identical_query(rag):
+    state = ConversationState(last_query="how to reset")
+    asyncio.run(rag.pipeline.rerank_with_cache("and on android", [
+        rag.module.Document(content=h["content"], metadata={"id": h["id"]}) for h in hits(1, 2)
+    ], state))
+    calls = len(rag.reranker.calls)
+
+    asyncio.run(rag.pipeline.rerank_with_cache("and on android", [
+        rag.module.Document(content=h["content"], metadata={"id": h["id"]}) for h in hits(1, 2, 3)
+    ], state))
+    assert len(rag.reranker.calls) == calls + 1
+    assert rag.reranker.calls[-1][1] == [3]
+
+def test_trace_records_rerank_scores(rag):
+    state = ConversationState()
+    trace = rag.module.InteractionRecord(query="how to reset")
+    rag.qdrant.results = hits(1, 2, 5)
+    asyncio.run(rag.pipeline.get_relevant_documents("how to reset", state, trace))
+    assert trace.doc_ids == [5, 2, 1]
+    assert trace.rerank_scores == [5.0, 2.0, 1.0]
+    assert trace.scores == [0.5, 0.5, 0.5]